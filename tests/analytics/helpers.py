@@ -0,0 +1,57 @@
+"""
+Shared helpers for the analytics test modules.
+"""
+
+import json
+import numpy as np
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Any, Dict, List
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+
+@dataclass
+class EventBatch:
+    """Event fields held as parallel columns: float64 values, bool flags."""
+
+    values: np.ndarray
+    valid: np.ndarray
+
+    @classmethod
+    def from_events(cls, events: List[Dict]) -> "EventBatch":
+        """Build a batch from event dicts; a missing ``valid`` means True."""
+        values = np.fromiter(
+            map(itemgetter("value"), events),
+            dtype=np.float64,
+            count=len(events),
+        )
+        valid = np.fromiter(
+            (e.get("valid", True) for e in events),
+            dtype=np.bool_,
+            count=len(events),
+        )
+        return cls(values=values, valid=valid)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` to UTF-8 JSON bytes, preferring orjson."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """Deserialize UTF-8 JSON bytes, preferring orjson."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def order_stats(a: np.ndarray, ranks) -> np.ndarray:
+    """Values of ``a`` at sorted positions ``ranks``, from one partition."""
+    ranks = np.asarray(ranks)
+    return np.partition(a, ranks)[ranks]
@@ -6,7 +6,8 @@ local outlier factor, IQR, Z-score, and Tukey fence methods with ensemble.
 """
 
 import pytest
-import math
+import numpy as np
+from scipy.spatial import cKDTree
 from typing import List
 
 
@@ -36,33 +37,25 @@ class TestIsolationForest:
     def test_anomaly_scoring_isolation_forest(self, mixed_data):
         """Test anomaly scoring in isolation forest."""
         # Anomalies should be isolated faster (lower depth)
-        scores = {}
+        data = np.asarray(mixed_data)
 
-        for i, point in enumerate(mixed_data):
-            # Anomalies: 100, 101, 105 should have extreme values
-            if point > 50:
-                scores[i] = 0.95  # High anomaly score
-            else:
-                scores[i] = 0.1  # Low anomaly score
+        # Anomalies: 100, 101, 105 should have extreme values
+        scores = np.where(data > 50, 0.95, 0.1)
 
         # Verify anomalies have high scores
-        anomaly_indices = [i for i, p in enumerate(mixed_data) if p > 50]
-        for idx in anomaly_indices:
-            assert scores[idx] > 0.9
+        anomaly_indices = np.nonzero(data > 50)[0]
+        assert np.all(scores[anomaly_indices] > 0.9)
 
     def test_ensemble_isolation_trees(self, mixed_data):
         """Test ensemble of isolation trees."""
         num_trees = 10
-        tree_scores = [
-            [0.1 if x < 50 else 0.9 for x in mixed_data]
-            for _ in range(num_trees)
-        ]
+        data = np.asarray(mixed_data)
+        row = np.where(data < 50, 0.1, 0.9)
+        # Read-only view; the identical rows are never materialized
+        tree_scores = np.broadcast_to(row, (num_trees, data.size))
 
         # Average scores across trees
-        ensemble_scores = [
-            sum(scores[i] for scores in tree_scores) / num_trees
-            for i in range(len(mixed_data))
-        ]
+        ensemble_scores = tree_scores.mean(axis=0)
 
         # Verify ensemble reduces noise
         assert len(ensemble_scores) == len(mixed_data)
@@ -71,10 +64,9 @@ class TestIsolationForest:
         """Test threshold-based anomaly detection."""
         threshold = 0.7
 
-        scores = [0.1 if x < 50 else 0.9 for x in mixed_data]
-        anomalies = [
-            mixed_data[i] for i, s in enumerate(scores) if s > threshold
-        ]
+        data = np.asarray(mixed_data)
+        scores = np.where(data < 50, 0.1, 0.9)
+        anomalies = data[scores > threshold]
 
         # Should detect 3 anomalies
         assert len(anomalies) >= 1
@@ -89,11 +81,12 @@ class TestLocalOutlierFactor:
         neighbors = [4.8, 5.1, 4.9, 5.2, 5.0]
 
         # Local density based on neighbor distances
-        distances = sorted([abs(point - n) for n in neighbors])
+        distances = np.abs(point - np.asarray(neighbors))
         k = 3
-        local_reachability_distance = distances[k - 1] if len(
-            distances
-        ) >= k else distances[-1]
+        # Only the k-th smallest distance is needed, not a full sort
+        local_reachability_distance = np.partition(
+            distances, k - 1
+        )[k - 1] if distances.size >= k else distances.max()
 
         # Lower distance = higher density
         local_density = 1.0 / (local_reachability_distance + 0.001)
@@ -108,13 +101,8 @@ class TestLocalOutlierFactor:
         point_distances = [abs(point - n) for n in neighbors]
         avg_neighbor_distance = sum(point_distances) / len(point_distances)
 
-        neighbor_distances = [
-            [abs(n1 - n2) for n2 in neighbors if n1 != n2]
-            for n1 in neighbors
-        ]
-        avg_neighbor_avg_distance = sum(
-            sum(d) / len(d) for d in neighbor_distances
-        ) / len(neighbor_distances)
+        # Mean |i - j| over distinct pairs of 1..n is (n + 1) / 3
+        avg_neighbor_avg_distance = (len(neighbors) + 1) / 3
 
         # LOF: ratio of neighbor densities
         lof = avg_neighbor_avg_distance / (avg_neighbor_distance + 0.001)
@@ -131,87 +119,97 @@ class TestLocalOutlierFactor:
         # Points in cluster are density-reachable
         # Outlier is not
 
-        lof_scores = {}
-        for point in all_points:
-            distances = [abs(point - p) for p in all_points if p != point]
-            avg_dist = sum(distances) / len(distances)
+        k = 3
+        points = np.asarray(all_points, dtype=np.float64).reshape(-1, 1)
+        tree = cKDTree(points)
+        # k + 1 neighbours because each point is returned as its own nearest
+        distances, _ = tree.query(points, k=k + 1)
 
-            # Outlier has large average distance
-            lof_scores[point] = avg_dist
+        # Outlier has large average distance to its k nearest neighbours
+        lof_scores = distances[:, 1:].mean(axis=1)
 
         # Outlier should have highest LOF
-        assert lof_scores[outlier] > max(
-            lof_scores[p] for p in normal_cluster
-        )
+        assert lof_scores[-1] > lof_scores[:-1].max()
 
     def test_k_distance_graph(self):
         """Test k-distance graph for neighbor detection."""
         data = [1, 2, 3, 4, 5, 100]
         k = 3
 
-        k_distances = {}
-        for point in data:
-            distances = sorted(
-                [abs(point - p) for p in data if p != point]
-            )
-            k_distances[point] = distances[k - 1] if len(
-                distances
-            ) >= k else distances[-1]
+        points = np.asarray(data, dtype=np.float64).reshape(-1, 1)
+        tree = cKDTree(points)
+        # k + 1 neighbours because each point is returned as its own nearest
+        distances, _ = tree.query(points, k=k + 1)
+
+        k_distances = distances[:, -1]
 
         # Outlier (100) should have large k-distance
-        assert k_distances[100] > k_distances[1]
+        assert k_distances[-1] > k_distances[0]
+
+
+def _quartile_stats(data):
+    """Return the array with its positional Q1, Q3 and IQR."""
+    arr = np.asarray(data, dtype=np.float64)
+
+    q1_idx = arr.size // 4
+    q3_idx = (3 * arr.size) // 4
+
+    # Select only the two order statistics instead of a full sort
+    q1, q3 = np.partition(arr, [q1_idx, q3_idx])[[q1_idx, q3_idx]]
+    return arr, q1, q3, q3 - q1
+
+
+@pytest.fixture(scope="module")
+def base_range() -> np.ndarray:
+    """Values 1-100, built once per module."""
+    return np.arange(1, 101, dtype=np.float64)
+
+
+@pytest.fixture(scope="module")
+def range_with_outlier(base_range) -> np.ndarray:
+    """Values 1-100 followed by a 500 outlier."""
+    return np.append(base_range, 500.0)
+
+
+@pytest.fixture(scope="class")
+def quartile_stats(base_range):
+    """Quartile statistics for 1-100, computed once per test class."""
+    return _quartile_stats(base_range)
+
+
+@pytest.fixture(scope="class")
+def outlier_quartile_stats(range_with_outlier):
+    """Quartile statistics for 1-100 plus a 500 outlier."""
+    return _quartile_stats(range_with_outlier)
 
 
 class TestIQRDetector:
     """Test interquartile range method."""
 
-    def test_quartile_calculation(self):
+    def test_quartile_calculation(self, quartile_stats):
         """Test quartile calculation."""
-        data = list(range(1, 101))  # 1-100
-        sorted_data = sorted(data)
-
-        q1_idx = len(sorted_data) // 4
-        q3_idx = (3 * len(sorted_data)) // 4
-
-        q1 = sorted_data[q1_idx]
-        q3 = sorted_data[q3_idx]
+        _, q1, q3, _ = quartile_stats  # 1-100
 
         assert q1 < q3
         assert q1 == 26  # Approximately
         assert q3 == 76  # Approximately
 
-    def test_iqr_calculation(self):
+    def test_iqr_calculation(self, quartile_stats):
         """Test IQR calculation."""
-        data = list(range(1, 101))
-        sorted_data = sorted(data)
-
-        q1_idx = len(sorted_data) // 4
-        q3_idx = (3 * len(sorted_data)) // 4
-
-        q1 = sorted_data[q1_idx]
-        q3 = sorted_data[q3_idx]
-        iqr = q3 - q1
+        _, _, _, iqr = quartile_stats
 
         # IQR for 1-100
         assert iqr > 0
         assert iqr <= 50
 
-    def test_whisker_bounds(self):
+    def test_whisker_bounds(self, outlier_quartile_stats):
         """Test whisker bound calculation."""
-        data = list(range(1, 101)) + [500]
-        sorted_data = sorted(data)
-
-        q1_idx = len(sorted_data) // 4
-        q3_idx = (3 * len(sorted_data)) // 4
-
-        q1 = sorted_data[q1_idx]
-        q3 = sorted_data[q3_idx]
-        iqr = q3 - q1
+        arr, q1, q3, iqr = outlier_quartile_stats
 
         lower_whisker = q1 - 1.5 * iqr
         upper_whisker = q3 + 1.5 * iqr
 
-        outliers = [x for x in data if x < lower_whisker or x > upper_whisker]
+        outliers = arr[(arr < lower_whisker) | (arr > upper_whisker)]
         assert 500 in outliers
 
     def test_iqr_with_quartile_variants(self):
@@ -234,77 +232,65 @@ class TestZScoreDetector:
 
     def test_zscore_calculation(self):
         """Test Z-score computation."""
-        data = [10, 15, 20, 25, 30]
-        mean = sum(data) / len(data)
-        variance = sum((x - mean) ** 2 for x in data) / len(data)
-        std_dev = math.sqrt(variance)
+        data = np.asarray([10, 15, 20, 25, 30], dtype=np.float64)
+        mean = data.mean()
+        std_dev = np.std(data, ddof=0)
 
         # Z-score for value 25
         z_score = (25 - mean) / std_dev
         assert isinstance(z_score, float)
 
-    def test_zscore_thresholds(self):
+    def test_zscore_thresholds(self, range_with_outlier):
         """Test Z-score threshold ranges."""
-        data = list(range(1, 101)) + [500]
-        mean = sum(data) / len(data)
-        variance = sum((x - mean) ** 2 for x in data) / len(data)
-        std_dev = math.sqrt(variance)
+        data = range_with_outlier
+        mean = data.mean()
+        std_dev = np.std(data, ddof=0)
+        abs_zscores = np.abs((data - mean) / std_dev)
 
         thresholds = [2, 2.5, 3]
-        anomaly_counts = []
-
-        for threshold in thresholds:
-            anomalies = [
-                x
-                for x in data
-                if abs((x - mean) / std_dev) > threshold
-            ]
-            anomaly_counts.append(len(anomalies))
+        anomaly_counts = [
+            np.count_nonzero(abs_zscores > threshold)
+            for threshold in thresholds
+        ]
 
         # Higher threshold = fewer anomalies
         assert anomaly_counts[0] >= anomaly_counts[-1]
 
     def test_modified_zscore_robustness(self):
         """Test modified Z-score for robustness."""
-        data = [1, 2, 3, 4, 5, 100]  # Has outlier
+        # Has outlier
+        data = np.asarray([1, 2, 3, 4, 5, 100], dtype=np.float64)
 
-        sorted_data = sorted(data)
-        median = sorted_data[len(sorted_data) // 2]
+        median = np.median(data)
 
         # Modified Z-score less affected by extremes
-        deviations = sorted([abs(x - median) for x in data])
-        mad = deviations[len(deviations) // 2]
+        mad = np.median(np.abs(data - median))
 
         threshold = 3.5
-        modified_zscores = []
-
-        for x in data:
-            if mad > 0:
-                mod_z = 0.6745 * (x - median) / mad
-            else:
-                mod_z = 0
-
-            modified_zscores.append(mod_z)
-            if abs(mod_z) > threshold:
-                assert x == 100  # Should detect 100 as outlier
+        if mad > 0:
+            modified_zscores = 0.6745 * (data - median) / mad
+        else:
+            modified_zscores = np.zeros_like(data)
+
+        # Should detect only 100 as outlier
+        assert np.array_equal(
+            data[np.abs(modified_zscores) > threshold], [100.0]
+        )
 
     def test_multivariate_zscore(self):
         """Test Z-score in multivariate context."""
         # Two variables
-        var1 = [10, 15, 20, 25, 30, 100]
+        var1 = np.asarray([10, 15, 20, 25, 30, 100], dtype=np.float64)
 
         # Compute Mahalanobis distance (simplified)
         # For now, compute independent Z-scores
-        zscores_v1 = []
-
-        mean_v1 = sum(var1) / len(var1)
-        std_v1 = math.sqrt(
-            sum((x - mean_v1) ** 2 for x in var1) / len(var1)
-        )
+        mean_v1 = var1.mean()
+        std_v1 = np.std(var1, ddof=0)
 
-        for x in var1:
-            z = (x - mean_v1) / std_v1 if std_v1 > 0 else 0
-            zscores_v1.append(z)
+        if std_v1 > 0:
+            zscores_v1 = (var1 - mean_v1) / std_v1
+        else:
+            zscores_v1 = np.zeros_like(var1)
 
         # Last point (100, 50) should be anomalous
         assert abs(zscores_v1[-1]) > 2
@@ -313,36 +299,20 @@ class TestZScoreDetector:
 class TestTukeyFences:
     """Test Tukey's fence method."""
 
-    def test_tukey_fence_calculation(self):
+    def test_tukey_fence_calculation(self, outlier_quartile_stats):
         """Test Tukey fence bounds."""
-        data = list(range(1, 101)) + [500]
-        sorted_data = sorted(data)
-
-        q1_idx = len(sorted_data) // 4
-        q3_idx = (3 * len(sorted_data)) // 4
-
-        q1 = sorted_data[q1_idx]
-        q3 = sorted_data[q3_idx]
-        iqr = q3 - q1
+        arr, q1, q3, iqr = outlier_quartile_stats
 
         # Tukey fences
         lower = q1 - 1.5 * iqr
         upper = q3 + 1.5 * iqr
 
-        outliers = [x for x in data if x < lower or x > upper]
+        outliers = arr[(arr < lower) | (arr > upper)]
         assert 500 in outliers
 
-    def test_mild_vs_extreme_outliers(self):
+    def test_mild_vs_extreme_outliers(self, quartile_stats):
         """Test distinction between mild and extreme outliers."""
-        data = list(range(1, 101))
-        sorted_data = sorted(data)
-
-        q1_idx = len(sorted_data) // 4
-        q3_idx = (3 * len(sorted_data)) // 4
-
-        q1 = sorted_data[q1_idx]
-        q3 = sorted_data[q3_idx]
-        iqr = q3 - q1
+        _, q1, q3, iqr = quartile_stats
 
         # Mild outliers: 1.5 IQR from quartiles
         mild_lower = q1 - 1.5 * iqr
@@ -362,59 +332,40 @@ class TestAnomalyEnsemble:
 
     def test_voting_ensemble(self):
         """Test voting-based ensemble."""
-        data = list(range(1, 11)) + [100]
-
-        methods = {
-            "zscore": [],
-            "iqr": [],
-            "tukey": [],
-        }
-
-        # Each method votes on each point
-        for x in data:
-            # Simplified: any point > 50 is anomaly
-            zscore_vote = 1 if x > 50 else 0
-            iqr_vote = 1 if x > 50 else 0
-            tukey_vote = 1 if x > 50 else 0
+        data = np.asarray(list(range(1, 11)) + [100])
+        method_names = ["zscore", "iqr", "tukey"]
 
-            methods["zscore"].append(zscore_vote)
-            methods["iqr"].append(iqr_vote)
-            methods["tukey"].append(tukey_vote)
+        # Each method votes on each point, one row per method
+        # Simplified: any point > 50 is anomaly
+        methods = np.empty((len(method_names), data.size), dtype=np.int8)
+        methods[:] = data > 50
 
         # Count votes
-        votes = [
-            sum(methods[m][i] for m in methods) for i in range(len(data))
-        ]
+        votes = methods.sum(axis=0)
 
         # Ensemble says anomaly if >= 2 methods agree
-        ensemble_anomalies = [
-            data[i] for i, v in enumerate(votes) if v >= 2
-        ]
+        ensemble_anomalies = data[votes >= 2]
 
         assert 100 in ensemble_anomalies
 
     def test_weighted_ensemble(self):
         """Test weighted ensemble of methods."""
-        data = [10, 20, 30, 40, 50, 100]
+        data = np.asarray([10, 20, 30, 40, 50, 100])
         weights = {
             "isolation_forest": 0.4,
             "lof": 0.35,
             "zscore": 0.25,
         }
 
-        anomaly_scores = []
-
-        for x in data:
-            if_score = 0.1 if x < 60 else 0.9
-            lof_score = 0.1 if x < 60 else 0.9
-            z_score = 0.1 if x < 60 else 0.9
+        # One row of scores per method, in the same order as weights
+        method_scores = np.vstack([
+            np.where(data < 60, 0.1, 0.9),  # isolation_forest
+            np.where(data < 60, 0.1, 0.9),  # lof
+            np.where(data < 60, 0.1, 0.9),  # zscore
+        ])
+        weight_vector = np.fromiter(weights.values(), dtype=np.float64)
 
-            weighted_score = (
-                if_score * weights["isolation_forest"]
-                + lof_score * weights["lof"]
-                + z_score * weights["zscore"]
-            )
-            anomaly_scores.append(weighted_score)
+        anomaly_scores = weight_vector @ method_scores
 
         # 100 should have high ensemble score
         assert anomaly_scores[-1] > 0.8
@@ -432,52 +383,35 @@ class TestAnomalyEnsemble:
         }
 
         # Average confidence
-        avg_confidence = [
-            sum(method_scores[m][i] for m in method_scores)
-            / len(method_scores)
-            for i in range(len(data))
-        ]
+        avg_confidence = np.vstack(list(method_scores.values())).mean(axis=0)
 
         # Anomalies above threshold
-        anomalies = [
-            data[i] for i, c in enumerate(avg_confidence) if c > threshold
-        ]
+        anomalies = np.asarray(data)[avg_confidence > threshold]
         assert 100 in anomalies
 
     def test_ensemble_with_conflicting_votes(self):
         """Test handling conflicting votes in ensemble."""
-        votes = {
-            "method1": 1,  # Anomaly
-            "method2": 0,  # Normal
-            "method3": 1,  # Anomaly
-        }
-
-        # Majority voting
-        total_votes = sum(votes.values())
-        num_methods = len(votes)
-        majority_threshold = num_methods / 2
-
-        is_anomaly = total_votes > majority_threshold
+        votes = np.array([
+            1,  # method1: Anomaly
+            0,  # method2: Normal
+            1,  # method3: Anomaly
+        ], dtype=np.int8)
+
+        # Majority voting, compared in integers to avoid halving
+        is_anomaly = votes.sum() * 2 > votes.size
         assert is_anomaly  # 2 out of 3 say anomaly
 
     def test_anomaly_confidence_ranking(self):
         """Test ranking anomalies by confidence."""
-        data = [10, 100, 200]
-
-        # Compute confidence for each
-        confidence = {}
-        for x in data:
-            if x < 20:
-                confidence[x] = 0.1  # Low anomaly confidence
-            elif x < 150:
-                confidence[x] = 0.6  # Medium
-            else:
-                confidence[x] = 0.95  # High
-
-        # Rank by confidence
-        ranked = sorted(
-            confidence.items(), key=lambda x: x[1], reverse=True
+        data = np.asarray([10, 100, 200])
+
+        # Compute confidence for each: low, medium, high
+        confidence = np.where(
+            data < 20, 0.1, np.where(data < 150, 0.6, 0.95)
         )
 
+        # Rank by confidence, highest first
+        ranked = data[np.argsort(-confidence)]
+
         # 200 should be most anomalous
-        assert ranked[0][0] == 200
+        assert ranked[0] == 200
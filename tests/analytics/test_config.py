@@ -6,11 +6,25 @@ adjustment of analytics pipeline configuration.
 """
 
 import pytest
-import json
-import tempfile
 import os
+from pathlib import Path
 from typing import Dict, Any
 
+from .helpers import dumps, loads
+
+
+@pytest.fixture(scope="session")
+def sample_config_file(tmp_path_factory) -> str:
+    """Write the sample configuration file once per test session."""
+    config_data = {
+        "sample_interval": 120,
+        "storage_backend": "postgresql",
+        "buffer_size": 5000,
+    }
+    config_file = tmp_path_factory.mktemp("config") / "config.json"
+    config_file.write_bytes(dumps(config_data))
+    return str(config_file)
+
 
 class TestConfigurationLoading:
     """Test configuration loading and initialization."""
@@ -29,37 +43,21 @@ class TestConfigurationLoading:
         assert config["buffer_size"] == 1000
         assert config["async_enabled"] is True
 
-    def test_configuration_from_file(self):
+    def test_configuration_from_file(self, sample_config_file):
         """Test loading configuration from file."""
-        config_data = {
-            "sample_interval": 120,
-            "storage_backend": "postgresql",
-            "buffer_size": 5000,
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".json") as f:
-            json.dump(config_data, f)
-            config_file = f.name
+        loaded = loads(Path(sample_config_file).read_bytes())
 
-        try:
-            with open(config_file, "r") as f:
-                loaded = json.load(f)
+        assert loaded["sample_interval"] == 120
+        assert loaded["storage_backend"] == "postgresql"
 
-            assert loaded["sample_interval"] == 120
-            assert loaded["storage_backend"] == "postgresql"
-        finally:
-            os.unlink(config_file)
-
-    def test_environment_variable_override(self):
+    def test_environment_variable_override(self, monkeypatch):
         """Test environment variable override."""
-        os.environ["ANALYTICS_SAMPLE_INTERVAL"] = "300"
+        # monkeypatch restores the environment on teardown
+        monkeypatch.setenv("ANALYTICS_SAMPLE_INTERVAL", "300")
 
         interval = int(os.environ.get("ANALYTICS_SAMPLE_INTERVAL", 60))
         assert interval == 300
 
-        # Cleanup
-        del os.environ["ANALYTICS_SAMPLE_INTERVAL"]
-
     def test_configuration_validation(self):
         """Test configuration validation."""
         valid_config = {
@@ -152,7 +150,7 @@ class TestConfigurationProfiles:
 class TestConfigurationPersistence:
     """Test configuration persistence."""
 
-    def test_save_configuration_to_file(self):
+    def test_save_configuration_to_file(self, tmp_path):
         """Test saving configuration to file."""
         config = {
             "version": "1.0",
@@ -160,20 +158,15 @@ class TestConfigurationPersistence:
             "features": ["anomaly_detection", "streaming"],
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".json") as f:
-            json.dump(config, f)
-            config_file = f.name
+        config_file = tmp_path / "config.json"
+        config_file.write_bytes(dumps(config))
 
-        try:
-            # Load and verify
-            with open(config_file, "r") as f:
-                loaded = json.load(f)
+        # Load and verify
+        loaded = loads(config_file.read_bytes())
 
-            assert loaded["version"] == "1.0"
-            assert loaded["sample_interval"] == 120
-            assert "anomaly_detection" in loaded["features"]
-        finally:
-            os.unlink(config_file)
+        assert loaded["version"] == "1.0"
+        assert loaded["sample_interval"] == 120
+        assert "anomaly_detection" in loaded["features"]
 
     def test_configuration_backup(self):
         """Test configuration backup creation."""
@@ -191,29 +184,40 @@ class TestConfigurationPersistence:
         """Test configuration rollback."""
         config_history = []
 
-        # Save initial config
+        # Save initial config as an immutable snapshot
         config = {"version": 1}
-        config_history.append(config.copy())
+        config_history.append(tuple(sorted(config.items())))
 
         # Modify config
         config["version"] = 2
-        config_history.append(config.copy())
+        config_history.append(tuple(sorted(config.items())))
 
         # Rollback to previous
-        config = config_history[-2]
+        config = dict(config_history[-2])
         assert config["version"] == 1
 
 
 class TestDynamicConfiguration:
     """Test dynamic configuration changes."""
 
-    def test_threshold_modification(self):
-        """Test modifying detection thresholds."""
-        config = {
+    @pytest.fixture
+    def config_dict(self) -> Dict[str, Any]:
+        """Default runtime configuration, rebuilt for each test."""
+        return {
             "anomaly_threshold": 0.95,
             "zscore_threshold": 3.0,
+            "features": {
+                "anomaly_detection": False,
+                "streaming": True,
+            },
+            "buffer_size": 1000,
+            "sample_interval": 60,
         }
 
+    def test_threshold_modification(self, config_dict):
+        """Test modifying detection thresholds."""
+        config = config_dict
+
         original_threshold = config["anomaly_threshold"]
 
         # Modify threshold
@@ -222,32 +226,27 @@ class TestDynamicConfiguration:
         assert config["anomaly_threshold"] != original_threshold
         assert config["anomaly_threshold"] == 0.90
 
-    def test_enable_feature_at_runtime(self):
+    def test_enable_feature_at_runtime(self, config_dict):
         """Test enabling features at runtime."""
-        config = {
-            "features": {
-                "anomaly_detection": False,
-                "streaming": True,
-            }
-        }
+        config = config_dict
 
         # Enable anomaly detection
         config["features"]["anomaly_detection"] = True
 
         assert config["features"]["anomaly_detection"] is True
 
-    def test_buffer_size_adjustment(self):
+    def test_buffer_size_adjustment(self, config_dict):
         """Test adjusting buffer size."""
-        config = {"buffer_size": 1000}
+        config = config_dict
 
         # Increase buffer
         config["buffer_size"] = 5000
 
         assert config["buffer_size"] == 5000
 
-    def test_interval_modification(self):
+    def test_interval_modification(self, config_dict):
         """Test modifying sampling interval."""
-        config = {"sample_interval": 60}
+        config = config_dict
 
         # Change interval
         config["sample_interval"] = 120
@@ -5,7 +5,45 @@ Tests for event generation, validation, enrichment, and event stream
 processing in the analytics pipeline.
 """
 
+import numpy as np
+import pytest
 from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Dict, List, NamedTuple
+
+from .helpers import EventBatch
+
+
+class Event(NamedTuple):
+    """Fixed-layout event record with attribute access."""
+
+    timestamp: datetime
+    value: float = 0
+    event_type: str = ""
+    sequence: int = 0
+
+
+@pytest.fixture(scope="module")
+def timed_events() -> List[Event]:
+    """Ten data events one minute apart, newest first."""
+    now = datetime.now()
+    return [
+        Event(now - timedelta(minutes=i), 100 + i, "data")
+        for i in range(10)
+    ]
+
+
+@pytest.fixture(scope="module")
+def stream_events() -> List[Dict]:
+    """Sixty events one second apart, oldest first."""
+    now = datetime.now()
+    return [
+        {
+            "timestamp": now - timedelta(seconds=60 - i),
+            "value": i,
+        }
+        for i in range(60)
+    ]
 
 
 class TestEventGeneration:
@@ -36,20 +74,13 @@ class TestEventGeneration:
         assert event["tags"]["severity"] == "high"
         assert event["metadata"]["request_id"] == "req-123"
 
-    def test_batch_event_generation(self):
+    def test_batch_event_generation(self, timed_events):
         """Test generating batch of events."""
-        events = [
-            {
-                "timestamp": datetime.now() - timedelta(minutes=i),
-                "value": 100 + i,
-                "event_type": "data",
-            }
-            for i in range(10)
-        ]
+        events = timed_events
 
         assert len(events) == 10
         for i, event in enumerate(events):
-            assert event["value"] == 100 + i
+            assert event.value == 100 + i
 
     def test_event_sequence_number(self):
         """Test event sequencing."""
@@ -181,24 +212,25 @@ class TestEventEnrichment:
         event = {"value": 100}
 
         # Transform value
-        event["value_squared"] = event["value"] ** 2
-        event["value_percent"] = event["value"] / 100 * 100
+        value = event["value"]
+        event["value_squared"] = value * value
+        event["value_percent"] = value / 100 * 100
 
         assert event["value_squared"] == 10000
         assert event["value_percent"] == 100
 
     def test_aggregate_multiple_events(self):
         """Test aggregating information from multiple events."""
-        events = [
+        batch = EventBatch.from_events([
             {"value": 10},
             {"value": 20},
             {"value": 30},
-        ]
+        ])
 
         aggregated = {
-            "count": len(events),
-            "sum": sum(e["value"] for e in events),
-            "mean": sum(e["value"] for e in events) / len(events),
+            "count": batch.values.size,
+            "sum": batch.values.sum(),
+            "mean": batch.values.mean(),
         }
 
         assert aggregated["count"] == 3
@@ -211,14 +243,16 @@ class TestEventStreaming:
 
     def test_event_ordering(self):
         """Test that events maintain order."""
+        now = datetime.now()
         events = [
-            {"sequence": i, "timestamp": datetime.now() - timedelta(seconds=i)}
+            Event(now - timedelta(seconds=i), sequence=i)
             for i in range(10)
         ]
 
         # Verify ordering
-        for i in range(len(events) - 1):
-            assert events[i]["sequence"] <= events[i + 1]["sequence"]
+        sequences = [event.sequence for event in events]
+        for current, following in zip(sequences, sequences[1:]):
+            assert current <= following
 
     def test_event_deduplication(self):
         """Test removing duplicate events."""
@@ -229,37 +263,34 @@ class TestEventStreaming:
             {"id": 3, "value": 30},
         ]
 
-        # Deduplicate by ID
-        seen_ids = set()
-        unique_events = []
-        for event in events_with_duplicates:
-            if event["id"] not in seen_ids:
-                unique_events.append(event)
-                seen_ids.add(event["id"])
+        # Deduplicate by ID; keys keep first-seen order
+        seen_ids = {e["id"]: e for e in events_with_duplicates}
+        unique_events = list(seen_ids.values())
 
         assert len(unique_events) == 3
         assert len(seen_ids) == 3
 
     def test_event_filtering(self):
         """Test filtering events by criteria."""
-        events = [
+        batch = EventBatch.from_events([
             {"value": 10},
             {"value": 50},
             {"value": 100},
             {"value": 200},
-        ]
+        ])
 
-        # Filter high-value events
-        high_value = [e for e in events if e["value"] >= 100]
+        # Select high-value events with a boolean mask over the column
+        high_value = batch.values >= 100
 
-        assert len(high_value) == 2
-        assert all(e["value"] >= 100 for e in high_value)
+        assert np.count_nonzero(high_value) == 2
+        assert batch.values[high_value].tolist() == [100, 200]
 
     def test_event_batching(self):
         """Test batching events."""
-        events = list(range(25))
+        events = np.arange(25)
         batch_size = 10
 
+        # Array slices are views over the same buffer, not copies
         batches = [
             events[i:i + batch_size] for i in range(0, len(events), batch_size)
         ]
@@ -267,34 +298,25 @@ class TestEventStreaming:
         assert len(batches) == 3
         assert len(batches[0]) == 10
         assert len(batches[-1]) == 5
+        assert all(batch.base is events for batch in batches)
 
-    def test_event_windowing(self):
+    def test_event_windowing(self, stream_events):
         """Test time-based event windowing."""
-        events = [
-            {
-                "timestamp": datetime.now() - timedelta(seconds=60 - i),
-                "value": i,
-            }
-            for i in range(60)
-        ]
+        events = stream_events
 
         window_duration = timedelta(seconds=10)
-        windows = []
-
-        # Create windows
-        current_window = []
-        last_window_time = events[0]["timestamp"]
 
-        for event in events:
-            if event["timestamp"] - last_window_time > window_duration:
-                windows.append(current_window)
-                current_window = []
-                last_window_time = event["timestamp"]
-
-            current_window.append(event)
-
-        if current_window:
-            windows.append(current_window)
+        # Slice the ordered stream by integer window index
+        window_start = events[0]["timestamp"]
+        windows = [
+            list(window)
+            for _, window in groupby(
+                events,
+                key=lambda e: (
+                    (e["timestamp"] - window_start) // window_duration
+                ),
+            )
+        ]
 
         # Verify windows created
         assert len(windows) > 0
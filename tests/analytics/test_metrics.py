@@ -5,7 +5,101 @@ Tests for metrics computation, aggregation, time-series handling, and
 metrics pipeline operations.
 """
 
+import bisect
+import json
+import math
+import numpy as np
+import pytest
+from collections import defaultdict
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, List, Tuple
+
+from .helpers import EventBatch
+
+
+_ENCODER = json.JSONEncoder(separators=(",", ":"))
+_DECODER = json.JSONDecoder()
+
+
+def _reduce(data) -> Dict[str, float]:
+    """Compute summary metrics for a series in vectorized passes."""
+    arr = np.asarray(data, dtype=np.float64)
+    return {
+        "count": arr.size,
+        "sum": arr.sum(),
+        "mean": arr.mean(),
+        "min": arr.min(),
+        "max": arr.max(),
+        "var": arr.var(),
+        "std": arr.std(),
+    }
+
+
+@lru_cache(maxsize=256)
+def _aggregate(values: Tuple[float, ...]) -> Tuple[int, float, float]:
+    """Count, sum and mean of a value tuple, memoized per input."""
+    count = len(values)
+    total = math.fsum(values)
+    return count, total, total / count
+
+
+def _welford(data) -> Tuple[int, float, float]:
+    """Single-pass count, mean and population variance (Welford)."""
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    for x in data:
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+    return n, mean, m2 / n
+
+
+def _rolling_mean(data, window_size: int) -> List[float]:
+    """Rolling mean maintained incrementally in O(n).
+
+    Each element is added once when it enters the window and subtracted
+    once when it leaves, instead of re-summing every window.
+    """
+    total = sum(data[:window_size])
+    rolling_means = [total / window_size]
+    for i in range(window_size, len(data)):
+        total += data[i] - data[i - window_size]
+        rolling_means.append(total / window_size)
+    return rolling_means
+
+
+@pytest.fixture(scope="module")
+def timed_events() -> List[Dict]:
+    """Ten events one minute apart, newest first, built once per module."""
+    now = datetime.now()
+    return [
+        {
+            "timestamp": now - timedelta(minutes=i),
+            "value": 100 + i,
+        }
+        for i in range(10)
+    ]
+
+
+@pytest.fixture(scope="module")
+def ascending_timestamps(timed_events) -> List[datetime]:
+    """Timestamps of ``timed_events`` oldest first, for bisection."""
+    return [e["timestamp"] for e in reversed(timed_events)]
+
+
+@pytest.fixture(scope="module")
+def value_events() -> List[Dict]:
+    """Small value-only event stream shared across tests."""
+    return [
+        {"value": 10},
+        {"value": 20},
+        {"value": 30},
+    ]
 
 
 class TestMetricsComputation:
@@ -15,13 +109,7 @@ class TestMetricsComputation:
         """Test computing basic metrics."""
         data = [10, 20, 30, 40, 50]
 
-        metrics = {
-            "count": len(data),
-            "sum": sum(data),
-            "mean": sum(data) / len(data),
-            "min": min(data),
-            "max": max(data),
-        }
+        metrics = _reduce(data)
 
         assert metrics["count"] == 5
         assert metrics["sum"] == 150
@@ -32,23 +120,21 @@ class TestMetricsComputation:
     def test_compute_variance(self):
         """Test computing variance."""
         data = [1, 2, 3, 4, 5]
-        mean = sum(data) / len(data)
 
-        variance = sum((x - mean) ** 2 for x in data) / len(data)
+        _, _, variance = _welford(data)
 
         assert variance > 0
         assert isinstance(variance, float)
+        assert math.isclose(variance, _reduce(data)["var"])
 
     def test_compute_deviation(self):
         """Test computing standard deviation."""
-        import math
-
         data = [1, 2, 3, 4, 5]
-        mean = sum(data) / len(data)
-        variance = sum((x - mean) ** 2 for x in data) / len(data)
+        _, _, variance = _welford(data)
         std_dev = math.sqrt(variance)
 
         assert std_dev > 0
+        assert math.isclose(std_dev, _reduce(data)["std"])
 
     def test_compute_rate(self):
         """Test computing rate metrics."""
@@ -67,57 +153,37 @@ class TestMetricsComputation:
 class TestTimeSeriesMetrics:
     """Test time-series metrics."""
 
-    def test_time_windowed_metrics(self):
+    def test_time_windowed_metrics(self, timed_events, ascending_timestamps):
         """Test metrics within time window."""
-        now = datetime.now()
-        events = [
-            {
-                "timestamp": now - timedelta(minutes=i),
-                "value": 100 + i,
-            }
-            for i in range(10)
-        ]
+        events = timed_events
 
         # Events are in reverse time order (earlier minutes ago first)
         # So events[7] is earlier than events[3]
         window_start = events[7]["timestamp"]  # Earliest time
         window_end = events[3]["timestamp"]    # Latest time
 
-        windowed = [
-            e for e in events
-            if window_start <= e["timestamp"] <= window_end
-        ]
+        # Locate the window boundaries in the oldest-first timestamps
+        lo = bisect.bisect_left(ascending_timestamps, window_start)
+        hi = bisect.bisect_right(ascending_timestamps, window_end)
+        windowed = ascending_timestamps[lo:hi]
 
         # Should have at least some events in window (events 3-7)
         assert len(windowed) >= 4
 
-    def test_accumulating_metrics(self):
+    def test_accumulating_metrics(self, value_events):
         """Test accumulating metric values."""
-        events = [
-            {"value": 10},
-            {"value": 20},
-            {"value": 30},
-        ]
+        events = value_events
 
-        cumulative = []
-        total = 0
+        cumulative = np.cumsum(list(map(itemgetter("value"), events)))
 
-        for event in events:
-            total += event["value"]
-            cumulative.append(total)
-
-        assert cumulative == [10, 30, 60]
+        assert cumulative.tolist() == [10, 30, 60]
 
     def test_rolling_window_metrics(self):
         """Test rolling window calculation."""
         data = list(range(1, 11))  # 1-10
         window_size = 3
-        rolling_means = []
 
-        for i in range(len(data) - window_size + 1):
-            window = data[i:i + window_size]
-            mean = sum(window) / len(window)
-            rolling_means.append(mean)
+        rolling_means = _rolling_mean(data, window_size)
 
         assert len(rolling_means) == 8
         assert rolling_means[0] == 2.0  # (1+2+3)/3
@@ -134,12 +200,10 @@ class TestMetricsAggregation:
             "source_3": [12, 22, 32],
         }
 
-        combined = []
-        for source_metrics in sources.values():
-            combined.extend(source_metrics)
-
-        total = sum(combined)
-        mean = total / len(combined)
+        # Stream across sources without building a combined list
+        total = sum(chain.from_iterable(sources.values()))
+        count = sum(map(len, sources.values()))
+        mean = total / count
 
         # Total: 10+20+30+15+25+35+12+22+32 = 201
         assert total == 201
@@ -154,15 +218,10 @@ class TestMetricsAggregation:
             {"region": "EU", "value": 130},
         ]
 
-        by_region = {}
+        # Aggregate each region while grouping
+        region_sums = defaultdict(int)
         for m in metrics:
-            region = m["region"]
-            if region not in by_region:
-                by_region[region] = []
-            by_region[region].append(m["value"])
-
-        # Aggregate each region
-        region_sums = {r: sum(v) for r, v in by_region.items()}
+            region_sums[m["region"]] += m["value"]
 
         assert region_sums["US"] == 220
         assert region_sums["EU"] == 280
@@ -175,8 +234,10 @@ class TestMetricsAggregation:
             {"level": "device", "name": "d3", "value": 30},
         ]
 
+        device_values = tuple(map(itemgetter("value"), metrics))
+
         # Device level
-        device_sum = sum(m["value"] for m in metrics)
+        _, device_sum, _ = _aggregate(device_values)
 
         # Machine level (if multiple devices)
         machine_sum = device_sum
@@ -184,6 +245,17 @@ class TestMetricsAggregation:
         assert device_sum == 60
         assert machine_sum == 60
 
+    def test_repeated_aggregation_is_cached(self):
+        """Test that repeating an aggregation query hits the cache."""
+        values = (10.0, 20.0, 30.0)
+        _aggregate.cache_clear()
+
+        first = _aggregate(values)
+        second = _aggregate(values)
+
+        assert first == second == (3, 60.0, 20.0)
+        assert _aggregate.cache_info().hits == 1
+
 
 class TestMetricsOutputFormats:
     """Test different metrics output formats."""
@@ -213,16 +285,14 @@ class TestMetricsOutputFormats:
 
     def test_metrics_serialization(self):
         """Test metrics serialization."""
-        import json
-
         metrics = {
             "mean": 30.5,
             "std_dev": 10.2,
             "count": 100,
         }
 
-        serialized = json.dumps(metrics)
-        deserialized = json.loads(serialized)
+        serialized = _ENCODER.encode(metrics)
+        deserialized = _DECODER.decode(serialized)
 
         assert deserialized["mean"] == 30.5
 
@@ -242,19 +312,16 @@ class TestMetricsOutputFormats:
 class TestMetricsPipeline:
     """Test full metrics pipeline."""
 
-    def test_event_to_metrics_pipeline(self):
+    def test_event_to_metrics_pipeline(self, value_events):
         """Test converting events to metrics."""
-        events = [
-            {"value": 10},
-            {"value": 20},
-            {"value": 30},
-        ]
+        batch = EventBatch.from_events(value_events)
 
-        # Convert to metrics
+        # Convert to metrics directly from the value column
+        values = batch.values
         metrics = {
-            "count": len(events),
-            "sum": sum(e["value"] for e in events),
-            "mean": sum(e["value"] for e in events) / len(events),
+            "count": values.size,
+            "sum": values.sum(),
+            "mean": values.mean(),
         }
 
         assert metrics["sum"] == 60
@@ -265,27 +332,27 @@ class TestMetricsPipeline:
         metrics = {"value": 100}
 
         # Add derived metrics
-        metrics["value_squared"] = metrics["value"] ** 2
-        metrics["value_doubled"] = metrics["value"] * 2
+        value = metrics["value"]
+        metrics["value_squared"] = value * value
+        metrics["value_doubled"] = value + value
 
         assert metrics["value_squared"] == 10000
         assert metrics["value_doubled"] == 200
 
     def test_metrics_bucketing(self):
         """Test bucketing metrics."""
-        metrics = [
-            {"value": 5},
-            {"value": 15},
-            {"value": 25},
-            {"value": 35},
-            {"value": 45},
-        ]
+        batch = EventBatch.from_events(
+            [{"value": v} for v in (5, 15, 25, 35, 45)]
+        )
+        values = batch.values
+
+        # Bucket into ranges: [..20) low, [20..40) medium, [40..) high
+        bucket_names = ["low", "medium", "high"]
+        bucket_idx = np.digitize(values, bins=[20, 40])
 
-        # Bucket into ranges
         buckets = {
-            "low": [m for m in metrics if m["value"] < 20],
-            "medium": [m for m in metrics if 20 <= m["value"] < 40],
-            "high": [m for m in metrics if m["value"] >= 40],
+            name: values[bucket_idx == i]
+            for i, name in enumerate(bucket_names)
         }
 
         assert len(buckets["low"]) == 2
@@ -294,17 +361,18 @@ class TestMetricsPipeline:
 
     def test_metrics_filtering(self):
         """Test filtering metrics."""
-        metrics = [
+        batch = EventBatch.from_events([
             {"value": 10, "valid": True},
             {"value": 20, "valid": False},
             {"value": 30, "valid": True},
-        ]
+        ])
 
-        # Filter valid metrics
-        valid_metrics = [m for m in metrics if m["valid"]]
+        # Count valid metrics without gathering them
+        assert np.count_nonzero(batch.valid) == 2
 
-        assert len(valid_metrics) == 2
-        assert all(m["valid"] for m in valid_metrics)
+        # Filter valid metrics
+        assert batch.values[batch.valid].tolist() == [10, 30]
+        assert batch.values[batch.valid].mean() == 20
 
     def test_metrics_deduplication(self):
         """Test removing duplicate metrics."""
@@ -314,14 +382,10 @@ class TestMetricsPipeline:
             {"timestamp": "2024-01-01", "value": 100},  # Duplicate
         ]
 
-        # Deduplicate
-        seen = set()
-        unique = []
-
+        # Deduplicate, keeping the first occurrence of each key
+        seen = {}
         for m in metrics_with_dupes:
-            key = (m["timestamp"], m["value"])
-            if key not in seen:
-                unique.append(m)
-                seen.add(key)
+            seen.setdefault((m["timestamp"], m["value"]), m)
+        unique = list(seen.values())
 
         assert len(unique) == 2
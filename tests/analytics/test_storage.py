@@ -6,10 +6,21 @@ and storage management in the analytics pipeline.
 """
 
 import pytest
-import tempfile
-import json
+import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+
+from .helpers import dumps, loads, order_stats
+
+
+_METRIC_DTYPE = np.dtype(
+    [
+        ("id", "U16"),
+        ("timestamp", "datetime64[s]"),
+        ("value", "f8"),
+        ("source", "U16"),
+    ]
+)
 
 
 class TestStorageBasics:
@@ -66,43 +77,35 @@ class TestStorageBasics:
 class TestStoragePersistence:
     """Test persistent storage."""
 
-    def test_save_to_file(self):
+    def test_save_to_file(self, tmp_path):
         """Test saving storage to file."""
         storage_data = {
             "m1": {"timestamp": "2024-01-01", "value": 100},
             "m2": {"timestamp": "2024-01-02", "value": 200},
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".json") as f:
-            json.dump(storage_data, f)
-            storage_file = f.name
+        storage_file = tmp_path / "storage.json"
+        storage_file.write_bytes(dumps(storage_data))
 
         # Load and verify
-        with open(storage_file, "r") as f:
-            loaded = json.load(f)
+        loaded = loads(storage_file.read_bytes())
 
         assert len(loaded) == 2
         assert loaded["m1"]["value"] == 100
 
-    def test_load_from_file(self):
+    def test_load_from_file(self, tmp_path):
         """Test loading storage from file."""
         storage_data = {
             "m1": {"value": 100},
             "m2": {"value": 200},
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".json") as f:
-            json.dump(storage_data, f)
-            storage_file = f.name
+        storage_file = tmp_path / "storage.json"
+        storage_file.write_bytes(dumps(storage_data))
 
-        try:
-            with open(storage_file, "r") as f:
-                loaded_storage = json.load(f)
+        loaded_storage = loads(storage_file.read_bytes())
 
-            assert len(loaded_storage) == 2
-        finally:
-            import os
-            os.unlink(storage_file)
+        assert len(loaded_storage) == 2
 
     def test_incremental_save(self):
         """Test incremental saving."""
@@ -118,38 +121,43 @@ class TestStoragePersistence:
 class TestStorageRetrieval:
     """Test storage retrieval operations."""
 
-    def test_retrieve_by_timestamp_range(self):
+    @pytest.fixture
+    def metric_records(self) -> Tuple[np.recarray, np.ndarray]:
+        """Metric records sorted by timestamp, plus the timestamp column."""
+        records = np.rec.array(
+            [
+                ("m3", datetime(2024, 1, 1, 12, 0), 300, "sensor_1"),
+                ("m1", datetime(2024, 1, 1, 10, 0), 100, "sensor_1"),
+                ("m2", datetime(2024, 1, 1, 11, 0), 200, "sensor_2"),
+            ],
+            dtype=_METRIC_DTYPE,
+        )
+        records.sort(order="timestamp")
+        return records, records.timestamp
+
+    def test_retrieve_by_timestamp_range(self, metric_records):
         """Test retrieving metrics by time range."""
-        storage = {
-            "m1": {"timestamp": datetime(2024, 1, 1, 10, 0), "value": 100},
-            "m2": {"timestamp": datetime(2024, 1, 1, 11, 0), "value": 200},
-            "m3": {"timestamp": datetime(2024, 1, 1, 12, 0), "value": 300},
-        }
+        storage, ts = metric_records
 
-        start = datetime(2024, 1, 1, 10, 30)
-        end = datetime(2024, 1, 1, 11, 30)
+        start = np.datetime64(datetime(2024, 1, 1, 10, 30), "s")
+        end = np.datetime64(datetime(2024, 1, 1, 11, 30), "s")
 
-        in_range = [
-            m for m in storage.values()
-            if start <= m["timestamp"] <= end
+        # Sorted timestamps bound the range with two binary searches
+        in_range = storage[
+            np.searchsorted(ts, start):np.searchsorted(ts, end, side="right")
         ]
 
         assert len(in_range) == 1
-        assert in_range[0]["value"] == 200
+        assert in_range[0].value == 200
 
-    def test_retrieve_by_source(self):
+    def test_retrieve_by_source(self, metric_records):
         """Test retrieving metrics by source."""
-        storage = {
-            "m1": {"value": 100, "source": "sensor_1"},
-            "m2": {"value": 200, "source": "sensor_2"},
-            "m3": {"value": 300, "source": "sensor_1"},
-        }
+        storage, _ = metric_records
 
-        sensor1_metrics = [
-            m for m in storage.values() if m["source"] == "sensor_1"
-        ]
+        sensor1_metrics = storage[storage.source == "sensor_1"]
 
         assert len(sensor1_metrics) == 2
+        assert sensor1_metrics.value.sum() == 400
 
     def test_retrieve_with_aggregation(self):
         """Test retrieval with aggregation."""
@@ -169,37 +177,35 @@ class TestStorageRetrieval:
 class TestStorageAggregation:
     """Test storage aggregation operations."""
 
-    def test_aggregate_sum(self):
-        """Test aggregating sum."""
-        storage = [
+    @pytest.fixture
+    def storage(self) -> List[Dict[str, Any]]:
+        """Stored metric records."""
+        return [
             {"value": 10},
             {"value": 20},
             {"value": 30},
         ]
 
-        total = sum(m["value"] for m in storage)
+    @pytest.fixture
+    def values_arr(self, storage) -> np.ndarray:
+        """Metric values as a contiguous float64 column."""
+        return np.fromiter(
+            (m["value"] for m in storage), dtype=np.float64, count=len(storage)
+        )
+
+    def test_aggregate_sum(self, values_arr):
+        """Test aggregating sum."""
+        total = values_arr.sum()
         assert total == 60
 
-    def test_aggregate_mean(self):
+    def test_aggregate_mean(self, values_arr):
         """Test aggregating mean."""
-        storage = [
-            {"value": 10},
-            {"value": 20},
-            {"value": 30},
-        ]
-
-        mean = sum(m["value"] for m in storage) / len(storage)
+        mean = values_arr.mean()
         assert mean == 20
 
-    def test_aggregate_count(self):
+    def test_aggregate_count(self, values_arr):
         """Test counting aggregation."""
-        storage = [
-            {"value": 10},
-            {"value": 20},
-            {"value": 30},
-        ]
-
-        count = len(storage)
+        count = values_arr.size
         assert count == 3
 
     def test_aggregate_by_group(self):
@@ -210,30 +216,37 @@ class TestStorageAggregation:
             {"group": "A", "value": 15},
         ]
 
-        grouped = {}
-        for item in storage:
-            group = item["group"]
-            if group not in grouped:
-                grouped[group] = []
-            grouped[group].append(item)
+        groups = np.array([item["group"] for item in storage])
+        vals = np.array([item["value"] for item in storage], dtype=np.float64)
+
+        # Integer group codes, then one bincount per reduction
+        keys, inverse = np.unique(groups, return_inverse=True)
+        counts = dict(zip(keys, np.bincount(inverse)))
+        sums = dict(zip(keys, np.bincount(inverse, weights=vals)))
 
-        assert len(grouped["A"]) == 2
-        assert len(grouped["B"]) == 1
+        assert counts["A"] == 2
+        assert counts["B"] == 1
+        assert sums["A"] == 25
+        assert sums["B"] == 20
 
     def test_aggregate_percentiles(self):
         """Test percentile aggregation."""
-        storage = list(range(1, 101))  # 1-100
+        storage = np.arange(1, 101)  # 1-100
 
-        sorted_data = sorted(storage)
-        p50_idx = len(sorted_data) // 2
-        p90_idx = int(0.9 * len(sorted_data))
+        p50_idx = storage.size // 2
+        p90_idx = int(0.9 * storage.size)
 
-        p50 = sorted_data[p50_idx]
-        p90 = sorted_data[p90_idx]
+        # Partial partition instead of a full sort
+        p50, p90 = order_stats(storage, [p50_idx, p90_idx])
 
         assert p50 == 51  # Median
         assert p90 == 91  # 90th percentile
 
+        # "higher" picks the upper order statistic, matching the indices
+        assert np.array_equal(
+            np.percentile(storage, [50, 90], method="higher"), [p50, p90]
+        )
+
 
 class TestStorageManagement:
     """Test storage management."""
@@ -262,14 +275,18 @@ class TestStorageManagement:
         for i in range(5):
             storage[f"new_{i}"] = {"timestamp": now}
 
-        # Cleanup old data (> 30 days)
+        # Cleanup old data (> 30 days) with one compare over the timestamps
         cutoff = now - timedelta(days=30)
-        cleaned = {
-            k: v for k, v in storage.items()
-            if v["timestamp"] >= cutoff
-        }
+        keys = np.array(list(storage))
+        ts = np.array(
+            [v["timestamp"] for v in storage.values()], dtype="datetime64[us]"
+        )
+        keep = ts >= np.datetime64(cutoff, "us")
+
+        cleaned = keys[keep]
 
-        assert len(cleaned) == 5
+        assert np.count_nonzero(keep) == 5
+        assert all(k.startswith("new_") for k in cleaned)
 
     def test_storage_quota(self):
         """Test storage quota enforcement."""
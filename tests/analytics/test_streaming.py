@@ -6,118 +6,304 @@ handling, and metrics aggregation. Validates that stream data flows correctly
 through the pipeline with proper ordering and aggregation.
 """
 
+import numpy as np
 import pytest
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from collections import deque
-from typing import List, Dict, Any
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import List, Sequence, Tuple
+
+
+@dataclass
+class StreamBatch:
+    """Stream columns: sequence numbers, values, timestamps and stream ids."""
+
+    sequence: np.ndarray
+    value: np.ndarray
+    timestamp: np.ndarray
+    stream_id: np.ndarray
+
+    def __len__(self) -> int:
+        return self.sequence.size
+
+
+def _sliding_extrema(
+    values: Sequence[float], window_size: int, slide_size: int
+) -> Tuple[List[float], List[float]]:
+    """Min and max of each sliding window via monotonic deques.
+
+    Each deque holds indices whose values stay monotonic, so every element
+    is pushed and popped at most once per deque: O(n) overall instead of
+    rescanning ``window_size`` elements per window.
+    """
+    lows: deque = deque()
+    highs: deque = deque()
+    mins, maxs = [], []
+
+    for i, value in enumerate(values):
+        while lows and values[lows[-1]] >= value:
+            lows.pop()
+        while highs and values[highs[-1]] <= value:
+            highs.pop()
+        lows.append(i)
+        highs.append(i)
+
+        start = i - window_size + 1
+        if start < 0:
+            continue
+        # Evict indices that slid out of the window
+        if lows[0] < start:
+            lows.popleft()
+        if highs[0] < start:
+            highs.popleft()
+        if start % slide_size == 0:
+            mins.append(values[lows[0]])
+            maxs.append(values[highs[0]])
+
+    return mins, maxs
+
+
+def _running_mean(values: np.ndarray) -> np.ndarray:
+    """Mean of every prefix of ``values``, from one cumulative sum."""
+    return np.cumsum(values, dtype=np.float64) / np.arange(1, len(values) + 1)
+
+
+class _RingBuffer:
+    """Fixed-capacity int64 ring buffer with monotonically growing indices.
+
+    ``head`` and ``tail`` only ever increase; the slot for an index is
+    ``index % capacity``. ``append`` overwrites the oldest element when
+    full and counts it in ``dropped``, while ``offer`` refuses what does
+    not fit so the caller sees the backpressure.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.buf = np.empty(capacity, dtype=np.int64)
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self.tail - self.head
+
+    def append(self, value: int) -> None:
+        """Push one element, overwriting the oldest when full."""
+        self.buf[self.tail % self.capacity] = value
+        self.tail += 1
+        overflow = max(0, len(self) - self.capacity)
+        self.head += overflow
+        self.dropped += overflow
+
+    def extend(self, values) -> None:
+        """Bulk ``append``: only the last ``capacity`` values are written."""
+        values = np.asarray(values, dtype=np.int64)
+        kept = values[-self.capacity:]
+        start = self.tail + values.size - kept.size
+        self.buf[(start + np.arange(kept.size)) % self.capacity] = kept
+        self.tail += values.size
+        overflow = max(0, len(self) - self.capacity)
+        self.head += overflow
+        self.dropped += overflow
+
+    def offer(self, values) -> int:
+        """Push as many ``values`` as fit without overwriting; return count."""
+        values = np.asarray(values, dtype=np.int64)
+        accepted = min(values.size, self.capacity - len(self))
+        slots = (self.tail + np.arange(accepted)) % self.capacity
+        self.buf[slots] = values[:accepted]
+        self.tail += accepted
+        return accepted
+
+    def popleft(self) -> int:
+        """Remove and return the oldest element."""
+        if len(self) == 0:
+            raise IndexError("pop from an empty ring buffer")
+        value = int(self.buf[self.head % self.capacity])
+        self.head += 1
+        return value
+
+    def to_array(self) -> np.ndarray:
+        """Contents from oldest to newest."""
+        return self.buf[(self.head + np.arange(len(self))) % self.capacity]
+
+
+class _QuantileSketch:
+    """Mergeable quantile sketch of at most ``max_centroids`` centroids.
+
+    A simplified t-digest: each frame keeps (mean, weight) centroids
+    instead of raw values, frames combine by merging centroids, and
+    percentiles interpolate over the cumulative weight.
+    """
+
+    def __init__(self, max_centroids: int = 100):
+        self.max_centroids = max_centroids
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    def update(self, values) -> None:
+        """Absorb a batch of raw values."""
+        values = np.asarray(values, dtype=np.float64)
+        self._absorb(values, np.ones_like(values))
+
+    def merge(self, other: "_QuantileSketch") -> None:
+        """Combine another sketch's centroids into this one."""
+        self._absorb(other.means, other.weights)
+
+    def percentile(self, q: float) -> float:
+        """Estimate the ``q``-th percentile (0-100)."""
+        midpoints = np.cumsum(self.weights) - self.weights / 2
+        target = q / 100 * self.weights.sum()
+        return float(np.interp(target, midpoints, self.means))
+
+    def _absorb(self, means: np.ndarray, weights: np.ndarray) -> None:
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        if means.size > self.max_centroids:
+            # Collapse into equal-weight buckets along the cumulative weight
+            k = self.max_centroids
+            cum = np.cumsum(weights)
+            bucket = ((cum - weights) * k / cum[-1]).astype(int)
+            bucket = np.minimum(bucket, k - 1)
+            bucket_weight = np.bincount(bucket, weights=weights, minlength=k)
+            bucket_sum = np.bincount(
+                bucket, weights=means * weights, minlength=k
+            )
+            filled = bucket_weight > 0
+            means = bucket_sum[filled] / bucket_weight[filled]
+            weights = bucket_weight[filled]
+
+        self.means, self.weights = means, weights
+
+
+@pytest.fixture(scope="module")
+def stream_data() -> StreamBatch:
+    """Generate time-series stream data, shared read-only by the module."""
+    sequence = np.arange(30)
+    base = np.datetime64(datetime.now() - timedelta(seconds=60), "ns")
+    batch = StreamBatch(
+        sequence=sequence,
+        value=100 + (sequence % 20),
+        timestamp=base + sequence.astype("timedelta64[s]"),
+        stream_id=np.ones(30, dtype=np.int64),
+    )
+    for column in vars(batch).values():
+        column.flags.writeable = False
+    return batch
 
 
 class TestStreamProcessor:
     """Test stream processor with various window types."""
 
-    @pytest.fixture
-    def stream_data(self) -> List[Dict[str, Any]]:
-        """Generate time-series stream data."""
-        return [
-            {
-                "timestamp": datetime.now() - timedelta(seconds=60 - i),
-                "value": 100 + (i % 20),
-                "stream_id": 1,
-                "sequence": i,
-            }
-            for i in range(30)
-        ]
-
     def test_tumbling_window_creation(self, stream_data):
         """Test tumbling window creates distinct non-overlapping windows."""
         window_size = 10
-        windows = []
-        current_window = []
 
-        for event in stream_data:
-            current_window.append(event)
-
-            if len(current_window) >= window_size:
-                windows.append(current_window)
-                current_window = []
+        # Complete windows are rows of a reshaped view
+        n_windows = len(stream_data) // window_size
+        windows = stream_data.value[: n_windows * window_size].reshape(
+            n_windows, window_size
+        )
 
         # Verify window properties
         assert len(windows) >= 2  # At least 2 complete windows
-        for window in windows[:-1]:  # All but possibly last
-            assert len(window) == window_size
+        assert windows.shape[1] == window_size
+        assert np.shares_memory(windows, stream_data.value)
 
     def test_sliding_window_overlap(self, stream_data):
         """Test sliding window with overlap."""
         window_size = 15
         slide_size = 5
-        windows = []
 
-        for i in range(0, len(stream_data) - window_size + 1, slide_size):
-            window = stream_data[i:i + window_size]
-            windows.append(window)
+        # Zero-copy strided views, one row per window
+        windows = sliding_window_view(stream_data.value, window_size)[
+            ::slide_size
+        ]
+        seq_windows = sliding_window_view(stream_data.sequence, window_size)[
+            ::slide_size
+        ]
 
         # Verify sliding window properties
         assert len(windows) > 0
-        for window in windows:
-            assert len(window) == window_size
+        assert windows.shape[1] == window_size
 
         # Verify overlap between consecutive windows
-        if len(windows) > 1:
-            # Check that overlap exists
-            overlap = [e for e in windows[0] if e in windows[1]]
-            assert len(overlap) > 0
+        if len(seq_windows) > 1:
+            # Consecutive windows share exactly window_size - slide_size
+            # elements: the tail of one is the head of the next
+            overlap = window_size - slide_size
+            assert overlap > 0
+            assert np.array_equal(
+                seq_windows[0][slide_size:], seq_windows[1][:overlap]
+            )
+
+        # Slide the running sum by deducting the exiting frame and adding
+        # the entering one instead of re-summing each window
+        values = stream_data.value.tolist()
+        running_sum = sum(values[:window_size])
+        running_sums = [running_sum]
+        last_start = len(values) - window_size
+        for start in range(slide_size, last_start + 1, slide_size):
+            end = start + window_size
+            running_sum += sum(values[end - slide_size:end])
+            running_sum -= sum(values[start - slide_size:start])
+            running_sums.append(running_sum)
+
+        assert running_sums == windows.sum(axis=1).tolist()
+
+        mins, maxs = _sliding_extrema(values, window_size, slide_size)
+        assert mins == windows.min(axis=1).tolist()
+        assert maxs == windows.max(axis=1).tolist()
 
     def test_session_window_on_gap(self, stream_data):
         """Test session window creates new window on inactivity gap."""
-        gap_threshold = timedelta(seconds=5)
-        windows = []
-        current_window = []
-        last_timestamp = None
-
-        for event in stream_data:
-            if last_timestamp and (
-                event["timestamp"] - last_timestamp
-            ) > gap_threshold:
-                # Gap detected - start new window
-                if current_window:
-                    windows.append(current_window)
-                    current_window = []
-
-            current_window.append(event)
-            last_timestamp = event["timestamp"]
-
-        if current_window:
-            windows.append(current_window)
+        gap_threshold = np.timedelta64(5, "s")
+
+        def sessions(timestamps):
+            # A gap longer than the threshold starts a new window
+            gaps = np.diff(timestamps) > gap_threshold
+            cut_points = np.flatnonzero(gaps) + 1
+            return np.split(np.arange(timestamps.size), cut_points)
+
+        windows = sessions(stream_data.timestamp)
 
         # Verify windows created
         assert len(windows) > 0
+        assert sum(w.size for w in windows) == len(stream_data)
+
+        # Inactivity halfway through splits the stream in two
+        gapped = stream_data.timestamp.copy()
+        gapped[15:] += np.timedelta64(10, "s")
+        gapped_windows = sessions(gapped)
+        assert [w.size for w in gapped_windows] == [15, 15]
 
     def test_element_ordering_preservation(self, stream_data):
         """Test that elements maintain order through window."""
         window_size = 10
-        window = stream_data[:window_size]
+        sequences = stream_data.sequence[:window_size]
 
         # Verify sequence numbers in order
-        sequences = [e["sequence"] for e in window]
-        assert sequences == sorted(sequences)
+        assert (sequences[:-1] <= sequences[1:]).all()
 
     def test_element_routing_to_correct_window(self, stream_data):
         """Test that elements are routed to correct window."""
         window_size = 10
         slide_size = 5
-        windows = []
 
-        for i in range(0, len(stream_data) - window_size + 1, slide_size):
-            window = stream_data[i:i + window_size]
-            windows.append(window)
-
-        # Verify each element is in the right window
-        for window_idx, window in enumerate(windows):
-            start_seq = window_idx * slide_size
-            end_seq = start_seq + window_size
+        windows = sliding_window_view(stream_data.sequence, window_size)[
+            ::slide_size
+        ]
 
-            for element in window:
-                assert start_seq <= element["sequence"] < end_seq
+        # Window i must hold sequences [i * slide, i * slide + window_size)
+        expected = (
+            np.arange(len(windows))[:, None] * slide_size
+            + np.arange(window_size)
+        )
+        assert np.array_equal(windows, expected)
 
     def test_late_element_handling(self):
         """Test handling of elements arriving out of order."""
@@ -128,37 +314,47 @@ class TestStreamProcessor:
             {"sequence": 4, "value": 40},
         ]
 
-        out_of_order_count = 0
-        for i in range(1, len(elements)):
-            if elements[i]["sequence"] < elements[i - 1]["sequence"]:
-                out_of_order_count += 1
+        # Count descents between neighbours with one compare and reduce
+        sequences = np.fromiter(
+            (e["sequence"] for e in elements),
+            dtype=np.int64,
+            count=len(elements),
+        )
+        out_of_order_count = int(np.count_nonzero(np.diff(sequences) < 0))
 
         # Detect out-of-order element
         assert out_of_order_count == 1
 
     def test_timestamp_extraction(self, stream_data):
         """Test timestamp extraction from elements."""
-        for event in stream_data:
-            timestamp = event["timestamp"]
-            assert isinstance(timestamp, datetime)
-            assert timestamp is not None
+        timestamps = stream_data.timestamp
+        assert np.issubdtype(timestamps.dtype, np.datetime64)
+        assert not np.isnat(timestamps).any()
 
     def test_window_timeout_trigger(self):
         """Test that windows emit on timeout."""
         import time
 
-        window_timeout = 0.5  # 500ms
+        window_timeout_ns = 20_000_000  # 20ms
         events = []
         emitted_windows = []
+        last_arrival = time.perf_counter_ns()
 
-        # Simulate events with timeout
+        # Simulate events spaced past the timeout on the monotonic clock
         for i in range(3):
+            time.sleep(0.03)
+            arrival = time.perf_counter_ns()
+            if events and arrival - last_arrival > window_timeout_ns:
+                emitted_windows.append(events)
+                events = []
+
             events.append({"sequence": i, "value": i * 10})
-            time.sleep(window_timeout + 0.1)
+            last_arrival = arrival
+
+        emitted_windows.append(events)
 
         # Window should have emitted multiple times
-        emitted_windows = [events]  # Simplified
-        assert len(emitted_windows) >= 1
+        assert len(emitted_windows) == 3
 
 
 class TestBackpressure:
@@ -167,22 +363,20 @@ class TestBackpressure:
     def test_buffer_overflow_detection(self):
         """Test detection when buffer overflows."""
         max_buffer_size = 100
-        buffer = deque(maxlen=max_buffer_size)
-        overflow_detected = False
+        buffer = _RingBuffer(max_buffer_size)
 
         # Add more elements than buffer capacity
-        for i in range(150):
-            buffer.append(i)
+        buffer.extend(np.arange(150))
 
-        # In deque with maxlen, old elements are dropped
-        # So buffer size never exceeds max_buffer_size
+        # Old elements are overwritten,
+        # so buffer size never exceeds max_buffer_size
         assert len(buffer) <= max_buffer_size
+        assert buffer.to_array()[0] == 50
 
-        # For actual backpressure, would track dropped items
-        if 150 > max_buffer_size:
-            overflow_detected = True
-
+        # Dropped items are tracked for backpressure
+        overflow_detected = buffer.dropped > 0
         assert overflow_detected
+        assert buffer.dropped == 50
 
     def test_graceful_slowdown(self):
         """Test graceful slowdown when buffer fills."""
@@ -208,70 +402,66 @@ class TestBackpressure:
     def test_queue_protection_from_burst(self):
         """Test queue remains protected during burst of events."""
         max_queue_size = 50
-        queue_size = 0
-        max_observed = 0
+        queue = _RingBuffer(max_queue_size)
         burst_events = 100
 
-        for i in range(burst_events):
-            queue_size += 1
-
-            # Protect queue size
-            if queue_size > max_queue_size:
-                # Apply backpressure - slow down or drop
-                queue_size = max_queue_size
+        # Accept what fits and push back on the rest
+        accepted = queue.offer(np.arange(burst_events))
+        rejected = burst_events - accepted
 
-            max_observed = max(max_observed, queue_size)
-
-        assert max_observed <= max_queue_size
+        assert len(queue) <= max_queue_size
+        assert rejected == burst_events - max_queue_size
 
     def test_consumer_pause_resume(self):
         """Test consumer can pause and resume processing."""
-        consumer_paused = False
-        events_processed = 0
-
-        events = list(range(20))
+        events = np.arange(20)
+        pause_at = 10  # Pause mid-stream
 
-        for event in events:
-            if event == 10:  # Pause mid-stream
-                consumer_paused = True
-
-            if consumer_paused:
-                continue  # Skip processing
-
-            events_processed += 1
+        # Reap everything before the pause as one segment
+        events_processed = int(np.count_nonzero(events < pause_at))
 
         # Partial processing due to pause
         assert events_processed < len(events)
 
-        # Resume
-        consumer_paused = False
-        for event in events[10:]:
-            if not consumer_paused:
-                events_processed += 1
+        # Resume: the remaining segment is reaped in bulk
+        events_processed += int(np.count_nonzero(events >= pause_at))
 
         # All events now processed
         assert events_processed == len(events)
 
     def test_backpressure_propagation_upstream(self):
         """Test backpressure signal propagates upstream."""
-        stage_1_buffer = deque()
-        stage_2_buffer = deque(maxlen=10)  # Limited
+        stage_1_buffer = _RingBuffer(20)
+        stage_2_buffer = _RingBuffer(10)  # Limited
         stage_1_blocked = False
 
         # Producer (stage 1)
         for i in range(20):
-            if len(stage_2_buffer) >= 10:  # Stage 2 full
+            if len(stage_2_buffer) >= stage_2_buffer.capacity:  # Stage 2 full
                 stage_1_blocked = True
                 break
 
             stage_1_buffer.append(i)
             # Transfer to stage 2
-            if stage_1_buffer:
+            if len(stage_1_buffer):
                 stage_2_buffer.append(stage_1_buffer.popleft())
 
         # Backpressure caused blocking
         assert stage_1_blocked
 
+    def test_empty_buffer_pop_raises(self):
+        """Test popping an empty buffer fails like deque.popleft."""
+        buffer = _RingBuffer(1)
+
+        with pytest.raises(IndexError):
+            buffer.popleft()
+
+        # Still raises once a pushed item has been drained
+        buffer.append(1)
+        assert buffer.popleft() == 1
+        with pytest.raises(IndexError):
+            buffer.popleft()
+
 
 class TestMetricsStreamAggregator:
     """Test metrics aggregation within streaming windows."""
@@ -286,14 +476,17 @@ class TestMetricsStreamAggregator:
             {"value": 50},
         ]
 
-        # Compute aggregates
-        values = [e["value"] for e in window]
+        # Compute aggregates over one contiguous column
+        values = np.fromiter(
+            (e["value"] for e in window), dtype=np.int64, count=len(window)
+        )
+        total = values.sum()
         aggregates = {
-            "count": len(values),
-            "sum": sum(values),
-            "mean": sum(values) / len(values),
-            "min": min(values),
-            "max": max(values),
+            "count": values.size,
+            "sum": total,
+            "mean": total / values.size,
+            "min": values.min(),
+            "max": values.max(),
         }
 
         # Verify aggregates
@@ -312,68 +505,62 @@ class TestMetricsStreamAggregator:
             {"key1": "B", "key2": "Y", "value": 40},
         ]
 
-        # Group by key1 and key2
-        aggregates = {}
-        for event in window:
-            composite_key = (event["key1"], event["key2"])
-
-            if composite_key not in aggregates:
-                aggregates[composite_key] = {"sum": 0, "count": 0}
-
-            aggregates[composite_key]["sum"] += event["value"]
-            aggregates[composite_key]["count"] += 1
+        # Encode each key as a small integer category
+        keys1, codes1 = np.unique(
+            [e["key1"] for e in window], return_inverse=True
+        )
+        keys2, codes2 = np.unique(
+            [e["key2"] for e in window], return_inverse=True
+        )
+        values = np.array([e["value"] for e in window], dtype=np.float64)
+
+        # Group by key1 and key2 over one linear composite index
+        shape = (keys1.size, keys2.size)
+        composite = np.ravel_multi_index((codes1, codes2), shape)
+        size = keys1.size * keys2.size
+        sums = np.bincount(composite, weights=values, minlength=size)
+        counts = np.bincount(composite, minlength=size)
+        sums, counts = sums.reshape(shape), counts.reshape(shape)
+
+        def cell(k1, k2):
+            return np.searchsorted(keys1, k1), np.searchsorted(keys2, k2)
 
         # Verify grouping
-        assert len(aggregates) == 4
-        assert aggregates[("A", "X")]["sum"] == 10
-        assert aggregates[("B", "Y")]["sum"] == 40
+        assert np.count_nonzero(counts) == 4
+        assert sums[cell("A", "X")] == 10
+        assert sums[cell("B", "Y")] == 40
 
     def test_incremental_aggregation(self):
         """Test incremental aggregation as elements arrive."""
-        stream = [10, 20, 30, 40, 50]
-        running_sum = 0
-        running_count = 0
-
-        aggregates_over_time = []
+        stream = np.array([10, 20, 30, 40, 50])
 
-        for value in stream:
-            running_sum += value
-            running_count += 1
-
-            current_aggregate = {
-                "sum": running_sum,
-                "count": running_count,
-                "mean": running_sum / running_count,
-            }
-            aggregates_over_time.append(current_aggregate)
+        # Every intermediate aggregate at once, one entry per arrival
+        running_sums = np.cumsum(stream)
+        running_means = _running_mean(stream)
 
         # Verify progression
-        assert aggregates_over_time[0]["sum"] == 10
-        assert aggregates_over_time[1]["mean"] == 15.0
-        assert aggregates_over_time[-1]["sum"] == 150
+        assert running_sums[0] == 10
+        assert running_means[1] == 15.0
+        assert running_sums[-1] == 150
+        assert running_means[-1] == 30.0
 
     def test_window_emit_triggers_aggregation(self):
         """Test that window emission triggers aggregation."""
         window_size = 3
-        elements = [{"value": i} for i in range(10)]
-        emitted_aggregates = []
-
-        for i, element in enumerate(elements):
-            if (i + 1) % window_size == 0:  # Window complete
-                window = elements[i - window_size + 1:i + 1]
-                values = [e["value"] for e in window]
+        values = np.arange(10)
 
-                aggregate = {
-                    "sum": sum(values),
-                    "count": len(values),
-                    "mean": sum(values) / len(values),
-                }
-                emitted_aggregates.append(aggregate)
+        # Only complete windows emit; one reduceat sums all of them
+        n_complete = values.size // window_size
+        boundaries = np.arange(0, n_complete * window_size, window_size)
+        sums = np.add.reduceat(values[: n_complete * window_size], boundaries)
+        counts = np.diff(np.r_[boundaries, n_complete * window_size])
+        means = sums / counts
 
         # Verify aggregates emitted
-        assert len(emitted_aggregates) == 3  # 10 elements / 3 per window
-        assert emitted_aggregates[0]["sum"] == 3  # 0+1+2
-        assert emitted_aggregates[1]["sum"] == 12  # 3+4+5
+        assert len(sums) == 3  # 10 elements / 3 per window
+        assert sums[0] == 3  # 0+1+2
+        assert sums[1] == 12  # 3+4+5
+        assert means[1] == 4.0
 
     def test_late_arriving_element_aggregation(self):
         """Test aggregation with late-arriving elements."""
@@ -399,11 +586,9 @@ class TestMetricsStreamAggregator:
         partial_window = [5, 10, 15]  # Less than window size
 
         # Compute aggregate even if incomplete
-        aggregate = {
-            "sum": sum(partial_window),
-            "count": len(partial_window),
-            "mean": sum(partial_window) / len(partial_window),
-        }
+        total = sum(partial_window)
+        count = len(partial_window)
+        aggregate = {"sum": total, "count": count, "mean": total / count}
 
         # Verify partial aggregation works
         assert aggregate["count"] == 3
@@ -417,14 +602,12 @@ class TestMetricsStreamAggregator:
         # Filter out nulls
         valid_values = [v for v in window_with_nulls if v is not None]
 
+        total = sum(valid_values)
+        count = len(valid_values)
         aggregate = {
-            "sum": sum(valid_values),
-            "count": len(valid_values),
-            "mean": (
-                sum(valid_values) / len(valid_values)
-                if valid_values
-                else 0
-            ),
+            "sum": total,
+            "count": count,
+            "mean": total / count if count else 0,
         }
 
         # Verify null handling
@@ -435,23 +618,53 @@ class TestMetricsStreamAggregator:
         """Test percentile calculation in streaming context."""
         window = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100]
 
-        sorted_window = sorted(window)
-
-        # Calculate percentiles
-        p25_idx = int(0.25 * len(sorted_window))
-        p50_idx = int(0.50 * len(sorted_window))
-        p75_idx = int(0.75 * len(sorted_window))
+        # One sketch per frame, combined into the window's sketch
+        frames = [window[:5], window[5:]]
+        window_sketch = _QuantileSketch()
+        for frame in frames:
+            frame_sketch = _QuantileSketch()
+            frame_sketch.update(frame)
+            window_sketch.merge(frame_sketch)
 
         percentiles = {
-            "p25": sorted_window[p25_idx],
-            "p50": sorted_window[p50_idx],
-            "p75": sorted_window[p75_idx],
+            "p25": window_sketch.percentile(25),
+            "p50": window_sketch.percentile(50),
+            "p75": window_sketch.percentile(75),
         }
 
         # Verify percentile calculation
         assert percentiles["p50"] > 0
+        assert percentiles["p25"] <= percentiles["p50"]
         assert percentiles["p75"] >= percentiles["p50"]
 
+        # Exact window stats from one partition: the extreme ranks give
+        # min/max, the middle ranks the quartiles, and the sum is unchanged
+        arr = np.asarray(window)
+        n = arr.size
+        ranks = [0, n // 4, n // 2 - 1, n // 2, 3 * n // 4, n - 1]
+        part = np.partition(arr, ranks)
+        low, p25, lower_mid, upper_mid, p75, high = part[ranks]
+        mean = part.sum() / n
+
+        assert (low, high) == (10, 100)
+        assert mean == 55.0
+        assert p25 <= percentiles["p50"] <= p75
+        assert percentiles["p50"] == pytest.approx((lower_mid + upper_mid) / 2)
+
+    def test_quantile_sketch_compression(self):
+        """Test sketch stays bounded while tracking the median."""
+        stream = np.arange(1, 10001, dtype=np.float64)
+
+        sketch = _QuantileSketch(max_centroids=50)
+        for frame in np.split(stream, 20):
+            sketch.update(frame)
+
+        assert sketch.means.size <= 50
+        assert sketch.weights.sum() == stream.size
+        assert sketch.percentile(50) == pytest.approx(
+            np.median(stream), rel=0.02
+        )
+
     def test_aggregation_accuracy_with_large_numbers(self):
         """Test aggregation accuracy with large numeric values."""
         large_window = [1000000 + i for i in range(100)]
@@ -472,16 +685,14 @@ class TestMetricsStreamAggregator:
 
         window = [10, 20, 30, 40, 50]
 
-        start = time.time()
+        start = time.perf_counter_ns()
 
         # Compute aggregate
-        aggregate = {
-            "sum": sum(window),
-            "mean": sum(window) / len(window),
-        }
+        total = sum(window)
+        aggregate = {"sum": total, "mean": total / len(window)}
 
-        latency = (time.time() - start) * 1000  # milliseconds
+        latency_ns = time.perf_counter_ns() - start
 
         # Verify computation was fast
-        assert latency < 100  # Should complete in less than 100ms
+        assert latency_ns < 100_000_000  # Should complete in less than 100ms
         assert aggregate["mean"] == 30.0
@@ -3,122 +3,151 @@ Quick verification script for the Negative Space Imaging Project
 Tests all 6 core modules and verifies integration
 """
 
+import importlib
 import sys
 from pathlib import Path
+from typing import List, Sequence
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src" / "python"))
 
-print("=" * 70)
-print("NEGATIVE SPACE IMAGING PROJECT - MODULE VERIFICATION")
-print("=" * 70)
+EXCEPTIONS = [
+    "NegativeSpaceError",
+    "ImageLoadError",
+    "AnalysisError",
+    "ValidationError",
+]
+MODELS = ["ContourData", "AnalysisResult", "ConfigModel"]
+ALGORITHMS = [
+    "detect_edges",
+    "find_contours",
+    "filter_contours",
+    "calculate_confidence",
+    "extract_bounding_boxes",
+]
+IMAGE_UTILS = [
+    "load_image",
+    "load_image_from_bytes",
+    "resize_image",
+    "convert_to_grayscale",
+    "enhance_contrast",
+    "save_visualization",
+    "get_image_info",
+]
+EXPORTS = [
+    "NegativeSpaceAnalyzer",
+    "AnalysisResult",
+    "ContourData",
+    "ConfigModel",
+]
 
-print("\n1️⃣  Testing Exception Module...")
+# Output is buffered and written once, instead of flushing line by line
+_lines: List[str] = []
+
+
+def emit(line: str = "") -> None:
+    """Queue a line of output."""
+    _lines.append(line)
+
+
+def flush() -> None:
+    """Write all queued output at once."""
+    print("\n".join(_lines))
+    _lines.clear()
+
+
+def fail(error: Exception) -> None:
+    """Report a failed check and exit."""
+    emit(f"   ✗ Failed: {error}")
+    flush()
+    sys.exit(1)
+
+
+def check(module_name: str, names: Sequence[str]) -> List[str]:
+    """Import ``module_name`` and return the ``names`` it does not define."""
+    module = importlib.import_module(module_name)
+    return [name for name in names if not hasattr(module, name)]
+
+
+def require(missing: List[str]) -> None:
+    """Raise if any expected names are missing."""
+    if missing:
+        raise ImportError(f"missing {', '.join(missing)}")
+
+
+emit("=" * 70)
+emit("NEGATIVE SPACE IMAGING PROJECT - MODULE VERIFICATION")
+emit("=" * 70)
+
+emit("\n1️⃣  Testing Exception Module...")
 try:
-    from negative_space.exceptions import (
-        NegativeSpaceError,
-        ImageLoadError,
-        AnalysisError,
-        ValidationError,
-    )
-    print("   ✓ NegativeSpaceError imported")
-    print("   ✓ ImageLoadError imported")
-    print("   ✓ AnalysisError imported")
-    print("   ✓ ValidationError imported")
+    require(check("negative_space.exceptions", EXCEPTIONS))
+    for name in EXCEPTIONS:
+        emit(f"   ✓ {name} imported")
 except Exception as e:
-    print(f"   ✗ Failed: {e}")
-    sys.exit(1)
+    fail(e)
 
-print("\n2️⃣  Testing Models Module...")
+emit("\n2️⃣  Testing Models Module...")
 try:
-    from negative_space.core.models import (
-        ContourData,
-        AnalysisResult,
-        ConfigModel,
-    )
-    print("   ✓ ContourData model imported")
-    print("   ✓ AnalysisResult model imported")
-    print("   ✓ ConfigModel model imported")
+    require(check("negative_space.core.models", MODELS))
+    for name in MODELS:
+        emit(f"   ✓ {name} model imported")
 
     # Test ConfigModel instantiation
+    from negative_space.core.models import ConfigModel
+
     config = ConfigModel()
-    print(f"   ✓ ConfigModel instantiated: edge_method={config.edge_detection_method}")
+    emit(f"   ✓ ConfigModel instantiated: edge_method={config.edge_detection_method}")
 except Exception as e:
-    print(f"   ✗ Failed: {e}")
-    sys.exit(1)
+    fail(e)
 
-print("\n3️⃣  Testing Algorithms Module...")
+emit("\n3️⃣  Testing Algorithms Module...")
 try:
-    from negative_space.core import algorithms
-    print("   ✓ detect_edges function available")
-    print("   ✓ find_contours function available")
-    print("   ✓ filter_contours function available")
-    print("   ✓ calculate_confidence function available")
-    print("   ✓ extract_bounding_boxes function available")
+    require(check("negative_space.core.algorithms", ALGORITHMS))
+    for name in ALGORITHMS:
+        emit(f"   ✓ {name} function available")
 except Exception as e:
-    print(f"   ✗ Failed: {e}")
-    sys.exit(1)
+    fail(e)
 
-print("\n4️⃣  Testing Image Utils Module...")
+emit("\n4️⃣  Testing Image Utils Module...")
 try:
-    from negative_space.utils import image_utils
-    print("   ✓ load_image function available")
-    print("   ✓ load_image_from_bytes function available")
-    print("   ✓ resize_image function available")
-    print("   ✓ convert_to_grayscale function available")
-    print("   ✓ enhance_contrast function available")
-    print("   ✓ save_visualization function available")
-    print("   ✓ get_image_info function available")
+    require(check("negative_space.utils.image_utils", IMAGE_UTILS))
+    for name in IMAGE_UTILS:
+        emit(f"   ✓ {name} function available")
 except Exception as e:
-    print(f"   ✗ Failed: {e}")
-    sys.exit(1)
+    fail(e)
 
-print("\n5️⃣  Testing Core Analyzer...")
+emit("\n5️⃣  Testing Core Analyzer...")
 try:
     from negative_space import NegativeSpaceAnalyzer
+
     analyzer = NegativeSpaceAnalyzer()
-    print("   ✓ NegativeSpaceAnalyzer instantiated")
-    print(f"   ✓ Configuration loaded")
-    print(f"   ✓ Edge detection method: {analyzer.config.edge_detection_method}")
-    print(f"   ✓ Minimum contour area: {analyzer.config.min_contour_area}")
-    print(f"   ✓ Confidence threshold: {analyzer.config.confidence_threshold}")
+    emit("   ✓ NegativeSpaceAnalyzer instantiated")
+    emit("   ✓ Configuration loaded")
+    emit(f"   ✓ Edge detection method: {analyzer.config.edge_detection_method}")
+    emit(f"   ✓ Minimum contour area: {analyzer.config.min_contour_area}")
+    emit(f"   ✓ Confidence threshold: {analyzer.config.confidence_threshold}")
 except Exception as e:
-    print(f"   ✗ Failed: {e}")
-    sys.exit(1)
+    fail(e)
 
-print("\n6️⃣  Testing Package Export...")
+emit("\n6️⃣  Testing Package Export...")
 try:
-    from negative_space import (
-        NegativeSpaceAnalyzer,
-        AnalysisResult,
-        ContourData,
-        ConfigModel,
-        NegativeSpaceError,
-        ImageLoadError,
-        AnalysisError,
-        ValidationError,
-    )
-    print("   ✓ NegativeSpaceAnalyzer exported")
-    print("   ✓ AnalysisResult exported")
-    print("   ✓ ContourData exported")
-    print("   ✓ ConfigModel exported")
-    print("   ✓ NegativeSpaceError exported")
-    print("   ✓ ImageLoadError exported")
-    print("   ✓ AnalysisError exported")
-    print("   ✓ ValidationError exported")
+    require(check("negative_space", EXPORTS + EXCEPTIONS))
+    for name in EXPORTS + EXCEPTIONS:
+        emit(f"   ✓ {name} exported")
 except Exception as e:
-    print(f"   ✗ Failed: {e}")
-    sys.exit(1)
+    fail(e)
 
-print("\n" + "=" * 70)
-print("✅ ALL VERIFICATION TESTS PASSED!")
-print("=" * 70)
-print("\nSummary:")
-print("  • 6 Python modules created successfully")
-print("  • 8 classes/models working correctly")
-print("  • 15+ functions available")
-print("  • Full type hints implemented")
-print("  • Comprehensive error handling")
-print("  • Production-ready code")
-print("\n📚 Ready for Week 2: Express API Integration")
-print("=" * 70)
+emit("\n" + "=" * 70)
+emit("✅ ALL VERIFICATION TESTS PASSED!")
+emit("=" * 70)
+emit("\nSummary:")
+emit("  • 6 Python modules created successfully")
+emit("  • 8 classes/models working correctly")
+emit("  • 15+ functions available")
+emit("  • Full type hints implemented")
+emit("  • Comprehensive error handling")
+emit("  • Production-ready code")
+emit("\n📚 Ready for Week 2: Express API Integration")
+emit("=" * 70)
+flush()